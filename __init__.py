@@ -28,9 +28,15 @@ import mycroft.util
 from jira import JIRA, JIRAError
 import os
 import re
+import json
+import uuid
+import collections
+import threading
 import time
 import datetime
+from multiprocessing.pool import ThreadPool
 import dateutil.parser
+from dateutil.tz import tzlocal, tzutc
 
 __author__ = 'jrwarwick'
 
@@ -38,11 +44,570 @@ __author__ = 'jrwarwick'
 # statements will show up in the command line when running Mycroft.
 LOGGER = getLogger(__name__)
 
+
+class IssueOutbox(object):
+    """Durable local queue of issue records waiting to be created on the
+    JIRA server. Every change is appended to a journal file on disk
+    before it is acted upon, so queued issues survive a restart and the
+    voice dialogue never has to wait on a slow or unreachable server.
+
+    Each queued issue carries a unique label so that a creation which
+    reached the server, but whose response was lost, can be found again
+    rather than created a second time. Issues the server rejects outright
+    (bad issue type, missing required field) are set aside as failed
+    instead of being retried forever.
+    """
+    LABEL_PREFIX = 'mycroft-outbox-'
+    REFERENCE_LABEL_PREFIX = 'mycroft-ref-'
+    # how many reference -> issue key mappings survive journal compaction
+    CREATED_HISTORY = 100
+
+    def __init__(self, journal_path):
+        self.journal_path = journal_path
+        self.pending = {}
+        self.failed = {}
+        # provisional reference -> issue key, oldest first
+        self.created = collections.OrderedDict()
+        self.next_reference = 1
+        # guards pending/journal; flush_lock keeps flushes from overlapping
+        self.lock = threading.RLock()
+        self.flush_lock = threading.Lock()
+        self._replay()
+
+    def _replay(self):
+        """Rebuild the pending queue from the on-disk journal."""
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'r') as journal:
+            for line in journal:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    self._apply(json.loads(line))
+                except (ValueError, KeyError):
+                    # Most likely a torn final write from a power loss.
+                    LOGGER.warning("Skipping unreadable outbox journal "
+                                   "entry: " + repr(line[0:80]))
+
+    def _apply(self, entry):
+        op = entry['op']
+        if op == 'queued':
+            self.pending[entry['local_id']] = entry
+            self.next_reference = max(self.next_reference,
+                                      entry['reference'] + 1)
+        elif op == 'attempted':
+            if entry['local_id'] in self.pending:
+                self.pending[entry['local_id']]['attempted'] = True
+        elif op == 'created':
+            self.pending.pop(entry['local_id'], None)
+            self.created.pop(entry['reference'], None)
+            self.created[entry['reference']] = entry['key']
+            while len(self.created) > self.CREATED_HISTORY:
+                self.created.popitem(last=False)
+        elif op == 'failed':
+            if entry['local_id'] in self.pending:
+                queued = self.pending.pop(entry['local_id'])
+                queued['error'] = entry['error']
+                self.failed[entry['local_id']] = queued
+        elif op == 'sequence':
+            self.next_reference = max(self.next_reference,
+                                      entry['next_reference'])
+
+    def _append(self, entry):
+        with open(self.journal_path, 'a') as journal:
+            journal.write(json.dumps(entry) + '\n')
+            journal.flush()
+            os.fsync(journal.fileno())
+        self._apply(entry)
+
+    def _compact(self):
+        """Rewrite the journal with only what is still needed: the
+        reference counter, any issues not yet created, failed issues, and
+        the most recent reference to issue key mappings.
+        """
+        temp_path = self.journal_path + '.tmp'
+        with open(temp_path, 'w') as journal:
+            journal.write(json.dumps({'op': 'sequence',
+                                      'next_reference': self.next_reference})
+                          + '\n')
+            for reference, key in self.created.items():
+                journal.write(json.dumps({'op': 'created', 'local_id': None,
+                                          'reference': reference,
+                                          'key': key}) + '\n')
+            for entry in sorted(self.pending.values(),
+                                key=lambda e: e['reference']):
+                journal.write(json.dumps(entry) + '\n')
+            for entry in sorted(self.failed.values(),
+                                key=lambda e: e['reference']):
+                queued = dict(entry)
+                error = queued.pop('error')
+                journal.write(json.dumps(queued) + '\n')
+                journal.write(json.dumps({'op': 'failed',
+                                          'local_id': entry['local_id'],
+                                          'error': error}) + '\n')
+            journal.flush()
+            os.fsync(journal.fileno())
+        os.rename(temp_path, self.journal_path)
+
+    def __len__(self):
+        with self.lock:
+            return len(self.pending)
+
+    def failed_count(self):
+        with self.lock:
+            return len(self.failed)
+
+    def lookup(self, reference):
+        """RETURN tuple (state, issue key or None) for a provisional
+        reference number, state being one of 'created', 'pending',
+        'failed' or None when the reference is unknown (or too old).
+        """
+        with self.lock:
+            if reference in self.created:
+                return ('created', self.created[reference])
+            for state, entries in (('pending', self.pending),
+                                   ('failed', self.failed)):
+                for entry in entries.values():
+                    if entry['reference'] == reference:
+                        return (state, None)
+        return (None, None)
+
+    def enqueue(self, fields):
+        """Journal a new issue record for later creation on the server.
+
+        RETURN integer provisional reference number, suitable for speaking
+        to the requestor right away.
+        """
+        with self.lock:
+            local_id = uuid.uuid4().hex
+            reference = self.next_reference
+            fields = dict(fields)
+            # the spoken reference goes on the record too, so staff can
+            # match it up when the requestor quotes it
+            fields['labels'] = (list(fields.get('labels', [])) +
+                                [self.LABEL_PREFIX + local_id,
+                                 self.REFERENCE_LABEL_PREFIX + str(reference)])
+            fields['description'] = (fields.get('description', '') +
+                                      "\n\nProvisional reference number: " +
+                                      str(reference)).strip()
+            entry = {'op': 'queued',
+                     'local_id': local_id,
+                     'reference': reference,
+                     'fields': fields}
+            self._append(entry)
+            return entry['reference']
+
+    def _reconcile(self, jira, entries):
+        """Look for issues that an earlier, interrupted flush may already
+        have created, and mark them as done instead of sending them again.
+        """
+        labels = [self.LABEL_PREFIX + e['local_id'] for e in entries]
+        found = jira.search_issues('labels in (' +
+                                   ', '.join('"' + l + '"' for l in labels) +
+                                   ')', fields='labels',
+                                   maxResults=len(labels))
+        created = []
+        for issue in found:
+            for entry in entries:
+                if self.LABEL_PREFIX + entry['local_id'] in issue.fields.labels:
+                    self._append({'op': 'created',
+                                  'local_id': entry['local_id'],
+                                  'reference': entry['reference'],
+                                  'key': issue.key})
+                    created.append((entry['reference'], issue.key))
+        return created
+
+    def _create(self, jira, field_list):
+        """Create issues on the server, one request for a single issue or a
+        bulk request for several. A request the server refuses outright
+        (HTTP 400) is retried one issue at a time so that each issue gets
+        its own verdict. Other errors propagate, to be retried later.
+
+        RETURN list of dicts with 'status', 'issue' and 'error', in the
+        same order as field_list.
+        """
+        if len(field_list) > 1:
+            try:
+                return jira.create_issues(field_list=field_list,
+                                          prefetch=False)
+            except JIRAError as jerr:
+                if jerr.status_code != 400:
+                    raise
+        results = []
+        for fields in field_list:
+            try:
+                results.append({'status': 'Success', 'error': None,
+                                'issue': jira.create_issue(fields=fields)})
+            except JIRAError as jerr:
+                if jerr.status_code != 400:
+                    raise
+                results.append({'status': 'Error', 'issue': None,
+                                'error': jerr.text})
+        return results
+
+    def flush(self, jira, project_key):
+        """Send all pending issue records to the JIRA server, using the bulk
+        create endpoint when more than one is waiting. Safe to call
+        repeatedly; a flush already in progress makes this a no-op.
+
+        RETURN list of (provisional reference, issue key) tuples for
+        records created during this call.
+        """
+        if not self.flush_lock.acquire(False):
+            return []
+        try:
+            with self.lock:
+                entries = sorted(self.pending.values(),
+                                 key=lambda e: e['reference'])
+            if not entries:
+                return []
+            created = []
+            attempted = [e for e in entries if e.get('attempted')]
+            if attempted:
+                created = self._reconcile(jira, attempted)
+                with self.lock:
+                    entries = [e for e in entries
+                               if e['local_id'] in self.pending]
+            field_list = []
+            for entry in entries:
+                fields = dict(entry['fields'])
+                if 'project' not in fields:
+                    fields['project'] = {'key': project_key}
+                field_list.append(fields)
+                with self.lock:
+                    self._append({'op': 'attempted',
+                                  'local_id': entry['local_id']})
+            results = self._create(jira, field_list) if field_list else []
+            for entry, result in zip(entries, results):
+                if result['status'] == 'Success':
+                    with self.lock:
+                        self._append({'op': 'created',
+                                      'local_id': entry['local_id'],
+                                      'reference': entry['reference'],
+                                      'key': result['issue'].key})
+                    created.append((entry['reference'], result['issue'].key))
+                else:
+                    # A validation error will not fix itself on retry.
+                    LOGGER.error("JIRA server rejected queued issue "
+                                 "reference " + str(entry['reference']) +
+                                 ", setting it aside: " +
+                                 str(result.get('error')))
+                    with self.lock:
+                        self._append({'op': 'failed',
+                                      'local_id': entry['local_id'],
+                                      'error': str(result.get('error'))})
+            with self.lock:
+                self._compact()
+            return created
+        finally:
+            self.flush_lock.release()
+
+
 # The logic of each skill is contained within its own class, which inherits
 # base methods from the MycroftSkill class with the syntax you can see below:
 # "class ____Skill(MycroftSkill)"
 
 
+class IssueTimelineStore(object):
+    """Local analytics store of per-issue status timelines, built from
+    JIRA changelogs. Changelogs are only fetched for issues updated since
+    the previous sync, so pulling expand=changelog stays cheap, and the
+    questions asked of it (SLA breaches, time stuck in a status, mean
+    time to resolution) are answered from the stored timelines without
+    going back to the server.
+
+    The store remembers which projects it covers (its scope); records of
+    projects dropped from the scope are discarded, and adding a project
+    triggers a fresh backfill.
+
+    Timestamps are kept as seconds since the epoch.
+    """
+    SEARCH_FIELDS = 'status,created,resolutiondate'
+    PAGE_SIZE = 100
+    # keys only, so the unresolved roll call can take bigger pages
+    KEY_PAGE_SIZE = 1000
+    # how far back the very first sync reaches for resolved issues
+    # (unresolved issues are always fetched, however old)
+    INITIAL_HISTORY_DAYS = 90
+    # minutes of overlap between incremental syncs, for clock skew
+    SYNC_OVERLAP_MINUTES = 5
+
+    def __init__(self, store_path):
+        self.store_path = store_path
+        self.issues = {}
+        self.last_sync = None
+        self.scope = None
+        # per-project running [seconds, count] totals, so mean time to
+        # resolution needs no scan
+        self.resolution_totals = {}
+        self.lock = threading.RLock()
+        self.sync_lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def epoch(then):
+        """Accept a datetime or parsable string.
+
+        RETURN float seconds since the epoch.
+        """
+        if not isinstance(then, datetime.datetime):
+            then = dateutil.parser.parse(then)
+        if then.tzinfo is None:
+            then = then.replace(tzinfo=tzlocal())
+        return (then - datetime.datetime(1970, 1, 1, tzinfo=tzutc())
+                ).total_seconds()
+
+    def _load(self):
+        if not os.path.exists(self.store_path):
+            return
+        try:
+            with open(self.store_path, 'r') as store:
+                saved = json.load(store)
+        except ValueError:
+            LOGGER.warning("Issue timeline store unreadable, starting over.")
+            return
+        # A store saved without a scope predates multi-project support;
+        # set_scope will clear out and backfill as needed.
+        self.scope = saved.get('scope')
+        self.last_sync = saved.get('last_sync')
+        for record in saved.get('issues', []):
+            self._put(record)
+
+    def save(self):
+        with self.lock:
+            temp_path = self.store_path + '.tmp'
+            with open(temp_path, 'w') as store:
+                json.dump({'last_sync': self.last_sync,
+                           'scope': self.scope,
+                           'issues': list(self.issues.values())}, store)
+            os.rename(temp_path, self.store_path)
+
+    @staticmethod
+    def project_of(record):
+        """RETURN string project key of a timeline record."""
+        return record.get('project') or record['key'].rsplit('-', 1)[0]
+
+    def _tally(self, record, sign):
+        if record['resolved'] is None:
+            return
+        totals = self.resolution_totals.setdefault(self.project_of(record),
+                                                   [0.0, 0])
+        totals[0] += sign * (record['resolved'] - record['created'])
+        totals[1] += sign
+
+    def _put(self, record):
+        """Insert or replace one issue record, keeping aggregates right."""
+        with self.lock:
+            old = self.issues.get(record['key'])
+            if old is not None:
+                self._tally(old, -1)
+            self._tally(record, 1)
+            self.issues[record['key']] = record
+
+    def set_scope(self, project_keys):
+        """Make the store cover exactly project_keys. Records of other
+        projects are dropped; if any project is new to the store, the next
+        sync is a full backfill rather than an incremental one.
+        """
+        scope = sorted(set(project_keys))
+        with self.lock:
+            if scope == self.scope:
+                return
+            for key, record in list(self.issues.items()):
+                if self.project_of(record) not in scope:
+                    self._tally(record, -1)
+                    del self.issues[key]
+            for project in list(self.resolution_totals):
+                if project not in scope:
+                    del self.resolution_totals[project]
+            if self.scope is None or set(scope) - set(self.scope):
+                self.last_sync = None
+            LOGGER.info("Issue timeline store scope now: " + ', '.join(scope))
+            self.scope = scope
+        self.save()
+
+    def build_record(self, issue):
+        """Turn a JIRA issue fetched with expand=changelog into a timeline
+        record: a list of [status, entered] intervals in order, plus the
+        current status and when it was entered.
+
+        RETURN dict timeline record.
+        """
+        created = self.epoch(issue.fields.created)
+        transitions = []
+        for history in issue.changelog.histories:
+            for item in history.items:
+                if item.field == 'status':
+                    transitions.append((self.epoch(history.created),
+                                        item.fromString, item.toString))
+        transitions.sort(key=lambda t: t[0])
+        if transitions:
+            intervals = [[transitions[0][1], created]]
+        else:
+            intervals = [[issue.fields.status.name, created]]
+        for when, from_status, to_status in transitions:
+            intervals.append([to_status, when])
+        resolved = None
+        if issue.fields.resolutiondate is not None:
+            resolved = self.epoch(issue.fields.resolutiondate)
+        return {'key': issue.key,
+                'project': issue.key.rsplit('-', 1)[0],
+                'created': created,
+                'resolved': resolved,
+                'status': intervals[-1][0],
+                'status_since': intervals[-1][1],
+                'intervals': intervals}
+
+    def sync(self, jira, jql_scope=None):
+        """Pull changelogs for issues updated since the last sync and fold
+        them into the store, then prune. A sync already in progress makes
+        this a no-op. Only saves to disk when something changed.
+
+        RETURN integer count of issues ingested.
+        """
+        if not self.sync_lock.acquire(False):
+            return 0
+        try:
+            started = time.time()
+            if self.last_sync is None:
+                jql = ('resolution = Unresolved OR updated >= -' +
+                       str(self.INITIAL_HISTORY_DAYS) + 'd')
+            else:
+                # Relative, so neither the device's nor the JIRA user
+                # profile's timezone matters; overlap a little rather
+                # than miss an update.
+                minutes = (int((started - self.last_sync) // 60) +
+                           self.SYNC_OVERLAP_MINUTES)
+                jql = 'updated >= -' + str(minutes) + 'm'
+            if jql_scope:
+                jql = '(' + jql_scope + ') AND (' + jql + ')'
+            ingested = 0
+            while True:
+                page = jira.search_issues(jql + ' ORDER BY updated ASC',
+                                          startAt=ingested,
+                                          maxResults=self.PAGE_SIZE,
+                                          fields=self.SEARCH_FIELDS,
+                                          expand='changelog')
+                for issue in page:
+                    self._put(self.build_record(issue))
+                ingested += len(page)
+                if not len(page) or ingested >= page.total:
+                    break
+            pruned = self._prune(jira, jql_scope)
+            with self.lock:
+                self.last_sync = started
+            if ingested or pruned:
+                self.save()
+            return ingested
+        finally:
+            self.sync_lock.release()
+
+    def _prune(self, jira, jql_scope=None):
+        """Drop unresolved records whose issue is no longer an unresolved
+        issue in scope: deleted, moved to another project (new key), or
+        no longer visible to us. Their updates never show up in a sync,
+        so they would otherwise count as stuck or breached forever.
+
+        RETURN integer count of records dropped.
+        """
+        jql = 'resolution = Unresolved'
+        if jql_scope:
+            jql = '(' + jql_scope + ') AND ' + jql
+        open_keys = set()
+        fetched = 0
+        while True:
+            page = jira.search_issues(jql + ' ORDER BY key',
+                                      startAt=fetched,
+                                      maxResults=self.KEY_PAGE_SIZE,
+                                      fields='key')
+            open_keys.update(issue.key for issue in page)
+            fetched += len(page)
+            if not len(page) or fetched >= page.total:
+                break
+        pruned = 0
+        with self.lock:
+            for key, record in list(self.issues.items()):
+                if record['resolved'] is None and key not in open_keys:
+                    self._tally(record, -1)
+                    del self.issues[key]
+                    pruned += 1
+        if pruned:
+            LOGGER.info("Dropped " + str(pruned) + " issue(s) from the "
+                        "timeline store, no longer open in scope.")
+        return pruned
+
+    def current_status_age(self, key, now=None):
+        """RETURN (status name, seconds in it so far) for issue key, or
+        None if the issue is unknown.
+        """
+        with self.lock:
+            record = self.issues.get(key)
+        if record is None:
+            return None
+        return (record['status'], (now or time.time()) - record['status_since'])
+
+    def stuck(self, status, threshold_seconds, projects=None, now=None):
+        """RETURN list of unresolved issue keys (of projects, if given)
+        sitting in status for longer than threshold_seconds, longest
+        stuck first.
+        """
+        now = now or time.time()
+        status = status.lower()
+        with self.lock:
+            stuck = [r for r in self.issues.values()
+                     if r['resolved'] is None and
+                     (projects is None or self.project_of(r) in projects) and
+                     r['status'].lower() == status and
+                     now - r['status_since'] > threshold_seconds]
+        stuck.sort(key=lambda r: r['status_since'])
+        return [r['key'] for r in stuck]
+
+    def sla_breaches(self, target_seconds, warning_ratio=0.8, projects=None,
+                     now=None):
+        """Check unresolved issues (of projects, if given) against a
+        time-to-resolution target.
+
+        RETURN tuple (breached keys, nearly breached keys).
+        """
+        now = now or time.time()
+        breached = []
+        nearly = []
+        with self.lock:
+            for record in self.issues.values():
+                if record['resolved'] is not None:
+                    continue
+                if (projects is not None and
+                        self.project_of(record) not in projects):
+                    continue
+                age = now - record['created']
+                if age > target_seconds:
+                    breached.append(record['key'])
+                elif age > target_seconds * warning_ratio:
+                    nearly.append(record['key'])
+        return breached, nearly
+
+    def resolved_count(self, projects=None):
+        """RETURN integer count of resolved issues (of projects, if given)."""
+        with self.lock:
+            return sum(count for project, (seconds, count)
+                       in self.resolution_totals.items()
+                       if projects is None or project in projects)
+
+    def mean_time_to_resolution(self, projects=None):
+        """RETURN float mean seconds from creation to resolution across
+        resolved issues (of projects, if given) in the store, or None if
+        there are none.
+        """
+        with self.lock:
+            totals = [t for project, t in self.resolution_totals.items()
+                      if projects is None or project in projects]
+            count = sum(t[1] for t in totals)
+            if not count:
+                return None
+            return sum(t[0] for t in totals) / count
+
+
 class JIRAagentSkill(MycroftSkill):
     # Constants from the core IP skill
     SEC_PER_LETTER = 0.65  # timing based on Mark 1 screen
@@ -50,6 +615,21 @@ class JIRAagentSkill(MycroftSkill):
     # Special Constants discoverd from Atlassian product documentation
     # omit leading slash, but include trailing slash
     JIRA_REST_API_PATH = 'rest/api/2/'
+    # seconds between background attempts to drain the issue outbox
+    OUTBOX_FLUSH_INTERVAL = 60
+    # minimum seconds between quiet background reconnect attempts
+    OUTBOX_RECONNECT_INTERVAL = 600
+    # seconds before any single JIRA request is abandoned, so a stalled
+    # server cannot wedge a background flush (and its lock) for good
+    JIRA_REQUEST_TIMEOUT = 30
+    # seconds between background changelog syncs for the timeline store
+    ANALYTICS_SYNC_INTERVAL = 900
+    # cap on concurrent per-project query workers, whatever the project count
+    MAX_PROJECT_WORKERS = 8
+    # seconds a per-project query result may be reused
+    PROJECT_CACHE_TTL = 60
+    # just enough for the spoken answer and for ranking across projects
+    TOP_ISSUE_FIELDS = 'summary,priority,duedate,created'
 
     class ServerConnectionError(Exception):
         """Simple, basic exception for any incomplete connection to the JIRA
@@ -64,10 +644,22 @@ class JIRAagentSkill(MycroftSkill):
         super(JIRAagentSkill, self).__init__(name="JIRAagentSkill")
         self.jira = None
         self.project_key = None
-
-
-    def server_login(self):
+        self.project_keys = []
+        self.project_cache = {}
+        self.project_cache_lock = threading.Lock()
+        self.project_pool = None
+        # priority id -> position in the server's configured order
+        self.priority_order = {}
+        self.outbox = None
+        self.login_rejected = False
+        self.last_quiet_reconnect = 0
+        self.timelines = None
+
+
+    def server_login(self, quiet=False):
         """Establish basic login via jira package interface (RESTful API)
+        If quiet, problems are only logged, never spoken (for background
+        use).
 
         RETURN the connection object.
         """
@@ -84,9 +676,10 @@ class JIRAagentSkill(MycroftSkill):
             else:
                 # There appears to be a planned, but so far only stub for this
                 # get_intro_message(self)  in docs. So, TODO-one-day?
-                self.speak("Please navigate to home.mycroft.ai to establish "
-                           "or complete JIRA Service Desk server access "
-                           "configuration.")
+                if not quiet:
+                    self.speak("Please navigate to home.mycroft.ai to establish "
+                               "or complete JIRA Service Desk server access "
+                               "configuration.")
                 # phrase is slightly different than home.configuration.prompt
                 LOGGER.debug("Probably missing part of the critical 3 settings.")
                 return None
@@ -104,20 +697,22 @@ class JIRAagentSkill(MycroftSkill):
             server_url = self.settings.get("url", "").strip()
             if (server_url[0:7].lower() != 'http://' and
                server_url[0:8].lower() != 'https://'):
-                self.speak("It seems that you have specified an invalid "
-                           "server U-R-L. A valid server U-R-L must include "
-                           "the h t t p colon slash slash prefix.")
-                self.speak_dialog("home.configuration.prompt")
+                if not quiet:
+                    self.speak("It seems that you have specified an invalid "
+                               "server U-R-L. A valid server U-R-L must include "
+                               "the h t t p colon slash slash prefix.")
+                    self.speak_dialog("home.configuration.prompt")
                 raise ValueError("server_url contained invalid URL, missing "
                                  "correct prefix: {server_url}"
                                  .format(server_url=repr(server_url)))
             if server_url.endswith(self.JIRA_REST_API_PATH):
-                self.speak("It seems that you have included the rest api 2 "
-                           "path in the server URL. This should work fine. "
-                           "However, if the API is upgraded, you may need to "
-                           "update my record of the endpoint URL.")
-                self.speak_dialog("home.configuration.prompt")
-                self.speak("If deemed necessary.")
+                if not quiet:
+                    self.speak("It seems that you have included the rest api 2 "
+                               "path in the server URL. This should work fine. "
+                               "However, if the API is upgraded, you may need to "
+                               "update my record of the endpoint URL.")
+                    self.speak_dialog("home.configuration.prompt")
+                    self.speak("If deemed necessary.")
             else:
                 if server_url[-1:] != '/':
                     server_url = server_url + '/'
@@ -125,13 +720,19 @@ class JIRAagentSkill(MycroftSkill):
             LOGGER.debug("Determined server_url is: " + server_url)
             new_jira_connection = JIRA(server=self.settings.get("url", ""),
                                        basic_auth=(self.settings.get("username", ""),
-                                                   self.settings.get("password", ""))
+                                                   self.settings.get("password", "")),
+                                       timeout=self.JIRA_REQUEST_TIMEOUT
                                        )
+            self.login_rejected = False
         except JIRAError as jerr:
             LOGGER.exception("JIRA Server connection failure! ",
                              jerr.text, jerr.status_code)
             LOGGER.info("JIRA Server connection failure! ",
                         jerr.text, jerr.status_code)
+            if jerr.status_code in (401, 403):
+                # Do not let background reconnects hammer a bad login
+                # into a captcha lockout.
+                self.login_rejected = True
             if jerr.status_code == 403 and jerr.text.strip().startswith("CAPTCHA_CHALLENGE"):
                 msg = ("JIRA server Login was denied and a captcha requirement "
                        "has been activated. Either login manually via web browser "
@@ -139,14 +740,17 @@ class JIRAagentSkill(MycroftSkill):
                        "login count' control in the User Management Module of "
                        "the Administration console in JIRA.")
                 LOGGER.info(msg)
-                self.speak(msg)
+                if not quiet:
+                    self.speak(msg)
             else:
                 # TODO: examine and detect login failiure due to credentials
                 #       (but no captcha barrier installed, yet)
                 msg = ("Unexpected connection error, consult tech support." +
                        jerr.text.strip()[0:100])
                 LOGGER.debug(msg)
-                self.speak(msg)
+                if not quiet:
+                    self.speak(msg)
+            return None
         except:
             LOGGER.exception("JIRA Server connection failure! (url=" + server_url)
             # TODO: consider: reraise and handle in calling function
@@ -157,8 +761,9 @@ class JIRAagentSkill(MycroftSkill):
         return new_jira_connection
 
 
-    def get_jira_project(self):
+    def get_jira_project(self, jira=None):
         """Determine JIRA project key (for autoamtic prefix to issue IDs)
+        using connection jira, by default self.jira.
 
         RETURN string which is project key
         """
@@ -171,31 +776,88 @@ class JIRAagentSkill(MycroftSkill):
         #  check for connection, return None if not connected? or allow
         #  the exception? or check for connection but /throw/ a logical
         #  exception?
-        return self.jira.projects()[0].key
+        return (jira or self.jira).projects()[0].key
 
-    def establish_server_connection(self):
+    def get_jira_projects(self, jira=None):
+        """Determine which JIRA projects this skill answers for, from the
+        comma separated project_keys setting. Unknown keys are dropped.
+        With nothing (valid) configured, falls back on get_jira_project.
+        Uses connection jira, by default self.jira.
+
+        RETURN list of project key strings, primary project first.
+        """
+        jira = jira or self.jira
+        configured = [key.strip().upper() for key in
+                      self.settings.get("project_keys", "").split(',')
+                      if key.strip()]
+        if configured:
+            known = set(project.key for project in jira.projects())
+            for key in configured:
+                if key not in known:
+                    LOGGER.warning("Configured JIRA project '" + key +
+                                   "' not found on server, ignoring it.")
+            configured = [key for key in configured if key in known]
+        if not configured:
+            configured = [self.get_jira_project(jira)]
+        return configured
+
+    def establish_server_connection(self, quiet=False):
         """Series of standard actions including login, but a few things
         beyond that any connect or reconnect should try to do. E.g.,
         determine the project short-name/prefix. Thus this should appar
-        at the top of almost every intent handler.
+        at the top of almost every intent handler. If quiet, nothing is
+        spoken (for background reconnects).
         """
         # which is server login, checking for auth failures, sort of
         # handling those and then after that, check for project prefix
         # and fill in or update via get_jira_project then use that at
         # top of the handlers as well as initialize.
         if self.jira is None:  # actually /do/ we want this to be conditional?
-            self.jira = self.server_login()
-            if self.jira is None:
+            # self.jira stays None until projects and worker pool are
+            # ready, since handlers take a non-None self.jira as usable.
+            new_jira_connection = self.server_login(quiet)
+            if new_jira_connection is None:
                 LOGGER.debug("self.jira server connection is None after call "
                              "to server_login(). "
                              "Cannot proceed without server connection.")
-                self.speak_dialog("server.connection.failure")
+                if not quiet:
+                    self.speak_dialog("server.connection.failure")
                 raise self.ServerConnectionError("Call to server_login returned None.")
             else:
-                self.project_key = self.get_jira_project()
+                try:
+                    self.project_keys = self.get_jira_projects(
+                        new_jira_connection)
+                except Exception:
+                    LOGGER.exception("Could not determine JIRA projects.")
+                    if not quiet:
+                        self.speak_dialog("server.connection.failure")
+                    raise self.ServerConnectionError("Project lookup failed.")
+                self.project_key = self.project_keys[0]
+                try:
+                    # Returned most urgent first, custom priorities included.
+                    self.priority_order = dict(
+                        (priority.id, position) for position, priority in
+                        enumerate(new_jira_connection.priorities()))
+                except Exception:
+                    LOGGER.exception("Could not fetch JIRA priority order; "
+                                     "cross-project ranking by priority "
+                                     "will be arbitrary.")
+                    self.priority_order = {}
                 LOGGER.info("JIRA project key set to '" + self.project_key + "'.")
+                if len(self.project_keys) > 1:
+                    LOGGER.info("Also answering for JIRA projects: " +
+                                ', '.join(self.project_keys[1:]))
+                self.project_cache = {}
+                if self.project_pool is not None:
+                    self.project_pool.close()
+                self.project_pool = ThreadPool(
+                    min(len(self.project_keys), self.MAX_PROJECT_WORKERS))
+                self.jira = new_jira_connection
                 # Maybe an optional announcement of same. 
                 # or maybe only announce on init case?
+                # Anything raised while we were offline can go now.
+                self.start_outbox_flush()
+                self.start_timeline_sync()
         else:
             # TODO: deeper investigation like maybe header check
             # or a simple issues list call with exception handling
@@ -221,6 +883,200 @@ class JIRAagentSkill(MycroftSkill):
         return re.sub("^(([Ff][Ww]:|[Rr][Ee]:) *)*", " ", summary_text.strip())
 
 
+    def project_scope_jql(self):
+        """RETURN string JQL clause limiting a search to our projects."""
+        return ('project in (' +
+                ', '.join('"' + key + '"' for key in self.project_keys) + ')')
+
+
+    def query_project(self, project_key, queries):
+        """Run each of queries against a single project, reusing cached
+        results younger than PROJECT_CACHE_TTL. Runs on a pool worker.
+
+        RETURN dict mapping query name to (total, top issue or None).
+        """
+        results = {}
+        now = time.time()
+        for name, clause, order_by in queries:
+            cache_key = (project_key, clause, order_by)
+            with self.project_cache_lock:
+                cached = self.project_cache.get(cache_key)
+            if cached is not None and now - cached[0] < self.PROJECT_CACHE_TTL:
+                results[name] = cached[1]
+                continue
+            inquiry = self.jira.search_issues('project = "' + project_key +
+                                              '" AND (' + clause + ') '
+                                              'ORDER BY ' + order_by,
+                                              maxResults=1,
+                                              fields=self.TOP_ISSUE_FIELDS)
+            result = (inquiry.total, inquiry[0] if len(inquiry) else None)
+            with self.project_cache_lock:
+                self.project_cache[cache_key] = (now, result)
+            results[name] = result
+        return results
+
+
+    def query_projects(self, queries):
+        """Accept a list of (name, JQL clause, JQL order by) tuples and run
+        them for every configured project, one pool worker per project,
+        so answer latency does not grow with the number of projects.
+
+        RETURN dict mapping query name to a tuple of (combined total,
+        dict of per-project totals, list of each project's top issue).
+        """
+        per_project = self.project_pool.map(
+            lambda key: (key, self.query_project(key, queries)),
+            self.project_keys)
+        merged = {}
+        for name, clause, order_by in queries:
+            totals = {}
+            tops = []
+            for key, results in per_project:
+                total, top = results[name]
+                totals[key] = total
+                if top is not None:
+                    tops.append(top)
+            merged[name] = (sum(totals.values()), totals, tops)
+        return merged
+
+
+    def across_projects(self, totals):
+        """RETURN string clause like " across 3 service desks" when more
+        than one project contributed to a combined count, otherwise "".
+        """
+        contributing = len([t for t in totals.values() if t > 0])
+        if contributing < 2:
+            return ""
+        return " across " + str(contributing) + " service desks"
+
+
+    def priority_rank(self, issue):
+        """RETURN sortable value, lowest for the most urgent priority,
+        per the server's configured priority order (see
+        establish_server_connection). Unknown or missing priorities
+        rank last.
+        """
+        priority = getattr(issue.fields, 'priority', None)
+        return self.priority_order.get(getattr(priority, 'id', None),
+                                       len(self.priority_order))
+
+
+    def flush_outbox(self, message=None, announce=False):
+        """Drain the local issue outbox to the JIRA server. Meant to run
+        in the background (scheduled event or worker thread), so it only
+        logs in quietly, and at most every OUTBOX_RECONNECT_INTERVAL, never
+        after the server has refused the login credentials. Only speaks
+        if announce, i.e. right after the requestor raised an issue.
+        """
+        if self.outbox is None or not len(self.outbox):
+            return
+        if self.jira is None or self.project_key is None:
+            if (self.login_rejected or time.time() -
+                    self.last_quiet_reconnect < self.OUTBOX_RECONNECT_INTERVAL):
+                LOGGER.debug("Issue outbox flush deferred, no server "
+                             "connection.")
+                return
+            self.last_quiet_reconnect = time.time()
+            try:
+                self.establish_server_connection(quiet=True)
+            except self.ServerConnectionError:
+                LOGGER.debug("Issue outbox flush deferred, background "
+                             "reconnect failed.")
+                return
+        try:
+            for reference, key in self.outbox.flush(self.jira,
+                                                    self.project_key):
+                LOGGER.info("Queued issue reference " + str(reference) +
+                            " created on server as " + key)
+                if announce:
+                    self.speak_dialog("issue.filed", {'reference': reference,
+                                                      'issue_key': key})
+                    self.set_context('IssueID', key)
+        except Exception:
+            # JIRAError or a plain network failure; either way, try later.
+            LOGGER.exception("Issue outbox flush failed, will retry.")
+
+
+    def start_outbox_flush(self, announce=False):
+        """Kick off an outbox flush without blocking the dialogue."""
+        if self.outbox is None or not len(self.outbox):
+            return
+        worker = threading.Thread(target=self.flush_outbox,
+                                  kwargs={'announce': announce},
+                                  name='JIRAoutboxFlush')
+        worker.daemon = True
+        worker.start()
+
+
+    def sync_timelines(self, message=None):
+        """Bring the issue timeline store up to date with the server.
+        Quiet, like flush_outbox, so it is fine as a scheduled event or
+        background thread; voice handlers use timelines_ready instead.
+        """
+        if self.timelines is None:
+            return
+        if self.jira is not None and self.project_keys:
+            self.timelines.set_scope(self.project_keys)
+            try:
+                ingested = self.timelines.sync(self.jira,
+                                               self.project_scope_jql())
+                LOGGER.debug("Timeline sync ingested " + str(ingested) +
+                             " updated issue(s).")
+            except Exception:
+                LOGGER.exception("Issue timeline sync failed.")
+
+
+    def timelines_ready(self):
+        """For voice handlers: answer from the store as it stands, and
+        freshen it in the background for next time.
+
+        RETURN True if the store has completed at least one sync.
+        """
+        if self.timelines is None:
+            return False
+        self.start_timeline_sync()
+        return self.timelines.last_sync is not None
+
+
+    def start_timeline_sync(self):
+        """Kick off a full timeline sync without blocking the dialogue."""
+        if (self.timelines is None or self.jira is None or
+                not self.project_keys):
+            return
+        worker = threading.Thread(target=self.sync_timelines,
+                                  name='JIRAtimelineSync')
+        worker.daemon = True
+        worker.start()
+
+
+    def numeric_setting(self, name, default):
+        """Accept the name of a free-text setting expected to hold a number.
+
+        RETURN float value of the setting, or default if blank or bad.
+        """
+        value = self.settings.get(name, "")
+        if value is None or str(value).strip() == "":
+            return float(default)
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            LOGGER.warning("Setting " + name + " is not a number: " +
+                           repr(value) + "; using " + str(default) + ".")
+            return float(default)
+
+
+    def descriptive_duration(self, seconds):
+        """Accept a count of seconds.
+
+        RETURN string which is a speakable, rough duration like "3 days"
+        """
+        if seconds < 7200:
+            return str(int(seconds // 60)) + " minutes"
+        elif seconds < 172800:
+            return str(int(seconds // 3600)) + " hours"
+        return str(int(seconds // 86400)) + " days"
+
+
     def descriptive_past(self, then):
         """Accept a datetime (or parsable string representation of same) as "then"
         to compare with an evaluated now.
@@ -259,6 +1115,20 @@ class JIRAagentSkill(MycroftSkill):
         """
         self.load_data_files(dirname(__file__))
 
+        self.outbox = IssueOutbox(os.path.join(self.file_system.path,
+                                               'outbox.journal'))
+        if len(self.outbox):
+            LOGGER.info(str(len(self.outbox)) + " issue(s) waiting in the "
+                        "outbox from a previous session.")
+        self.schedule_repeating_event(self.flush_outbox, None,
+                                      self.OUTBOX_FLUSH_INTERVAL,
+                                      name='JIRAoutboxFlush')
+        self.timelines = IssueTimelineStore(
+            os.path.join(self.file_system.path, 'timelines.json'))
+        self.schedule_repeating_event(self.sync_timelines, None,
+                                      self.ANALYTICS_SYNC_INTERVAL,
+                                      name='JIRAtimelineSync')
+
         status_report_intent = IntentBuilder("StatusReportIntent").\
             require("StatusReportKeyword").build()
         self.register_intent(status_report_intent,
@@ -297,6 +1167,21 @@ class JIRAagentSkill(MycroftSkill):
         self.register_intent(raise_issue_intent,
                              self.handle_raise_issue_intent)
 
+        stuck_issues_intent = IntentBuilder("StuckIssuesIntent").\
+            require("IssueRecordsKeyword").require("StuckKeyword").build()
+        self.register_intent(stuck_issues_intent,
+                             self.handle_stuck_issues_intent)
+
+        resolution_time_intent = IntentBuilder("ResolutionTimeIntent").\
+            require("ResolutionTimeKeyword").build()
+        self.register_intent(resolution_time_intent,
+                             self.handle_resolution_time_intent)
+
+        issue_reference_intent = IntentBuilder("IssueReferenceIntent").\
+            require("ProvisionalReference").build()
+        self.register_intent(issue_reference_intent,
+                             self.handle_issue_reference_intent)
+
         contact_info_intent = IntentBuilder("ContactInfoIntent").\
             require("ContactKeyword").require("ServiceDeskStaffKeyword").\
             build()
@@ -329,43 +1214,69 @@ class JIRAagentSkill(MycroftSkill):
             LOGGER.info("JIRA Server login appears to have succeded already.")
 
         self.speak("JIRA Service Desk status report:")
-        inquiry = self.jira.search_issues('assignee is EMPTY AND '
-                                          'status != Resolved '
-                                          'ORDER BY createdDate DESC')
-        if inquiry.total < 1:
+        answers = self.query_projects([
+            ('unassigned', 'assignee is EMPTY AND status != Resolved',
+             'createdDate DESC'),
+            ('overdue', 'status != Resolved AND duedate < now()', 'duedate'),
+            ('high', 'resolution = Unresolved AND priority > Medium',
+             'priority DESC')])
+
+        total, totals, tops = answers['unassigned']
+        if total < 1:
             self.speak("No JIRA issues found in the unassigned queue.")
         else:
-            self.speak(str(inquiry.total) + " issue" + ("", "s")[inquiry.total > 1] +
-                       " found in the unassigned queue.")
-            thissue = self.jira.issue(inquiry[0].key, fields='summary,comment')
+            self.speak(str(total) + " issue" + ("", "s")[total > 1] +
+                       " found in the unassigned queue" +
+                       self.across_projects(totals) + ".")
+            thissue = max(tops, key=lambda i: IssueTimelineStore.epoch(
+                i.fields.created))
             self.speak("Latest issue is regarding: " +
                        self.clean_summary(thissue.fields.summary))
 
-        inquiry = self.jira.search_issues('status != Resolved AND '
-                                          'duedate < now() '
-                                          'ORDER BY duedate')
-        if inquiry.total < 1:
+        total, totals, tops = answers['overdue']
+        if total < 1:
             self.speak("No overdue issues.")
         else:
-            self.speak(str(inquiry.total) + " issue" + ("", "s")[inquiry.total > 1] +
-                       " overdue!")
-            thissue = self.jira.issue(inquiry[0].key, fields='summary,comment')
+            self.speak(str(total) + " issue" + ("", "s")[total > 1] +
+                       " overdue" + self.across_projects(totals) + "!")
+            thissue = min(tops, key=lambda i: i.fields.duedate)
             self.speak("Most overdue issue is regarding: " +
                        self.clean_summary(thissue.fields.summary))
 
-        inquiry = self.jira.search_issues('resolution = Unresolved '
-                                          'AND priority > Medium '
-                                          'ORDER BY priority DESC')
-        if inquiry.total < 1:
+        total, totals, tops = answers['high']
+        if total < 1:
             self.speak("No HIGH priority JIRA issues remain open.")
         else:
-            self.speak(str(inquiry.total) + " high priority "
-                       "issue" + ("", "s")[inquiry.total > 1] +
-                       " remain" + ("s", "")[inquiry.total > 1] + " open!")
-            thissue = self.jira.issue(inquiry[0].key, fields='summary,comment')
+            self.speak(str(total) + " high priority "
+                       "issue" + ("", "s")[total > 1] +
+                       " remain" + ("s", "")[total > 1] + " open" +
+                       self.across_projects(totals) + "!")
+            thissue = min(tops, key=self.priority_rank)
             self.speak("Highest priority issue is regarding: " +
                        self.clean_summary(thissue.fields.summary))
-        # TODO: SLAs breached or nearly so, if you have that sort of thing.
+        sla_hours = self.numeric_setting("sla_hours", 0)
+        if sla_hours > 0 and self.timelines_ready():
+            breached, nearly = self.timelines.sla_breaches(
+                sla_hours * 3600, projects=self.project_keys)
+            if breached:
+                self.speak(str(len(breached)) + " issue" +
+                           ("", "s")[len(breached) > 1] +
+                           " past the resolution SLA!")
+            if nearly:
+                self.speak(str(len(nearly)) + " issue" +
+                           ("", "s")[len(nearly) > 1] +
+                           " nearly past the resolution SLA.")
+            if not breached and not nearly:
+                self.speak("No issues near their resolution SLA.")
+        if self.outbox is not None and len(self.outbox):
+            self.speak(str(len(self.outbox)) + " newly raised issue" +
+                       ("", "s")[len(self.outbox) > 1] +
+                       " still waiting to be filed with the server.")
+        if self.outbox is not None and self.outbox.failed_count():
+            failed = self.outbox.failed_count()
+            self.speak(str(failed) + " raised issue" + ("", "s")[failed > 1] +
+                       " could not be filed, the server rejected " +
+                       ("it", "them")[failed > 1] + ". Details are in the log.")
 
 
     def handle_issues_open_intent(self, message):
@@ -379,14 +1290,16 @@ class JIRAagentSkill(MycroftSkill):
         else:
             LOGGER.info("JIRA Server login appears to have succeded already.")
 
-        inquiry = self.jira.search_issues('status != Resolved '
-                                          'ORDER BY priority DESC, duedate ASC')
-        if inquiry.total < 1:
+        total, totals, tops = self.query_projects([
+            ('open', 'status != Resolved', 'priority DESC, duedate ASC')])['open']
+        if total < 1:
             self.speak("No unresolved issues.")
         else:
-            self.speak(str(inquiry.total) + " issue" + ("", "s")[inquiry.total > 1] +
-                       " remain unresolved.")
-            thissue = self.jira.issue(inquiry[0].key, fields='summary,comment')
+            self.speak(str(total) + " issue" + ("", "s")[total > 1] +
+                       " remain unresolved" + self.across_projects(totals) + ".")
+            thissue = min(tops, key=lambda i: (self.priority_rank(i),
+                                               i.fields.duedate is None,
+                                               i.fields.duedate))
             self.speak("Highest priority unresolved issue is regarding: " +
                        self.clean_summary(thissue.fields.summary))
 
@@ -402,19 +1315,90 @@ class JIRAagentSkill(MycroftSkill):
         else:
             LOGGER.info("JIRA Server login appears to have succeded already.")
 
-        inquiry = self.jira.search_issues('status != Resolved AND '
-                                          'duedate < now() '
-                                          'ORDER BY duedate')
-        if inquiry.total < 1:
+        total, totals, tops = self.query_projects([
+            ('overdue', 'status != Resolved AND duedate < now()',
+             'duedate')])['overdue']
+        if total < 1:
             self.speak("No overdue issues.")
         else:
-            self.speak(str(inquiry.total) + " issue" + ("", "s")[inquiry.total > 1] +
-                       " overdue!")
-            thissue = self.jira.issue(inquiry[0].key, fields='summary,comment')
+            self.speak(str(total) + " issue" + ("", "s")[total > 1] +
+                       " overdue" + self.across_projects(totals) + "!")
+            thissue = min(tops, key=lambda i: i.fields.duedate)
             self.speak("Most overdue issue is regarding: " +
                        self.clean_summary(thissue.fields.summary))
 
 
+    def handle_stuck_issues_intent(self, message):
+        """Report unresolved issues that have sat in one status (by default
+        Waiting for Support) for longer than a configured number of days.
+        """
+        if self.jira is None:
+            try:
+                self.establish_server_connection()
+            except self.ServerConnectionError:
+                LOGGER.debug("Caught connection error exception, "
+                             "bailing out of intent.")
+                return None
+        else:
+            LOGGER.info("JIRA Server login appears to have succeded already.")
+
+        if not self.timelines_ready():
+            self.speak("Sorry, I am still gathering issue history "
+                       "from the server. Please ask again shortly.")
+            return None
+        status = (self.settings.get("stuck_status", "") or
+                  "Waiting for Support").strip()
+        days = self.numeric_setting("stuck_days", 3)
+        stuck = self.timelines.stuck(status, days * 86400,
+                                     projects=self.project_keys)
+        if not stuck:
+            self.speak("No issues stuck in " + status + " for more than " +
+                       str(days).rstrip('0').rstrip('.') + " days.")
+        else:
+            self.speak(str(len(stuck)) + " issue" + ("", "s")[len(stuck) > 1] +
+                       " stuck in " + status + " for more than " +
+                       str(days).rstrip('0').rstrip('.') + " days.")
+            try:
+                thissue = self.jira.issue(stuck[0], fields='summary')
+                self.speak("Longest stuck is " + str(thissue.key) +
+                           " regarding: " +
+                           self.clean_summary(thissue.fields.summary))
+                self.set_context('IssueID', str(thissue.key))
+            except Exception:
+                # moved, deleted or no longer visible to us since last sync
+                self.speak("Search for further details on the issue record "
+                           "failed. Sorry.")
+                LOGGER.exception("JIRA issue API error!")
+
+
+    def handle_resolution_time_intent(self, message):
+        """Report mean time to resolution over recently resolved issues."""
+        if self.jira is None:
+            try:
+                self.establish_server_connection()
+            except self.ServerConnectionError:
+                LOGGER.debug("Caught connection error exception, "
+                             "bailing out of intent.")
+                return None
+        else:
+            LOGGER.info("JIRA Server login appears to have succeded already.")
+
+        if not self.timelines_ready():
+            self.speak("Sorry, I am still gathering issue history "
+                       "from the server. Please ask again shortly.")
+            return None
+        mean_seconds = self.timelines.mean_time_to_resolution(
+            projects=self.project_keys)
+        if mean_seconds is None:
+            self.speak("No resolved issues to measure yet.")
+        else:
+            resolved = self.timelines.resolved_count(projects=self.project_keys)
+            self.speak("Issues are resolved in " +
+                       self.descriptive_duration(mean_seconds) +
+                       " on average, over " + str(resolved) +
+                       " resolved issue" + ("", "s")[resolved > 1] + ".")
+
+
     # TODO: def handle_how_many_open_high_priority_issues(self, message):
     # TODO: def handle_how_many_vip_issues(self, message):
     # TODO: def handle_how_many_queue_issues(self, message):
@@ -438,13 +1422,17 @@ class JIRAagentSkill(MycroftSkill):
         else:
             LOGGER.info("JIRA Server login appears to have succeded already.")
 
-        inquiry = self.jira.search_issues('status != Resolved '
-                                          'ORDER BY priority desc, duedate asc,'
-                                          'createdDate asc')
-        if inquiry.total < 1:
+        total, totals, tops = self.query_projects([
+            ('urgent', 'status != Resolved',
+             'priority desc, duedate asc, createdDate asc')])['urgent']
+        if total < 1:
             self.speak("No unresolved issues found!")
         else:
-            thissue = self.jira.issue(inquiry[0].key, fields='summary,comment')
+            thissue = min(tops, key=lambda i: (self.priority_rank(i),
+                                               i.fields.duedate is None,
+                                               i.fields.duedate,
+                                               IssueTimelineStore.epoch(
+                                                   i.fields.created)))
             self.speak("The highest priority issue is " + str(thissue.key) +
                        " regarding: " + self.clean_summary(thissue.fields.summary))
             # TODO: strip the proj key prefix, if skill prefs
@@ -469,7 +1457,7 @@ class JIRAagentSkill(MycroftSkill):
             LOGGER.info("JIRA Server login appears to have succeded already.")
 
         issue_id = message.data.get('IssueID')
-        if re.match(self.project_key + '-[0-9]+', issue_id):
+        if re.match('(' + '|'.join(self.project_keys) + ')-[0-9]+', issue_id):
             pass
         elif isinstance(int(issue_id), int):
             issue_id = self.project_key + '-' + str(issue_id)
@@ -525,19 +1513,34 @@ class JIRAagentSkill(MycroftSkill):
         else:
             LOGGER.info("JIRA Server login appears to have succeded already.")
 
-        def issue_id_validator(utterance):
+        def issue_key_from(utterance):
+            """RETURN full issue key for an utterance of either a bare
+            issue number (primary project) or a configured project key
+            and number, like "HR 42" or "HR-42"; None if neither.
+            """
             # Confesion: "20 characters" is an arbitrary max in this re
-            return re.match(r'^[\s0-9]{1,20}$', utterance)
+            found = re.match(r'^(?:([A-Za-z][A-Za-z0-9_]*)[\s-]*)?'
+                             r'([0-9][\s0-9]{0,19})$', utterance.strip())
+            if found is None:
+                return None
+            prefix = (found.group(1) or self.project_key).upper()
+            if prefix not in self.project_keys:
+                return None
+            return prefix + '-' + re.sub(r'\s+', '', found.group(2))
+
+        def issue_id_validator(utterance):
+            return issue_key_from(utterance) is not None
 
         def valid_issue_id_desc(utterance):
-            return ("A valid issue I D is an integer number. "
-                    "No prefix, if you please. "
-                    "I will prefix the issue I D with a predetermined "
-                    "JIRA project name abbreviation. "
+            return ("A valid issue I D is an integer number, "
+                    "optionally preceded by a project key, one of " +
+                    ', '.join(self.project_keys) + ". "
+                    "Without a project key, I will use " +
+                    self.project_key + ". "
                     "Let us try again. ")
 
-        # TODO: flexibly/fuzzily, and somewhat reliably detect if user
-        # uttered the project name abbrev. prefix and just deal with it.
+        # TODO: flexibly/fuzzily detect a spoken project *name*, not
+        # just its key.
         issue_id = self.get_response(dialog='specify.issue',
                                      validator=issue_id_validator,
                                      on_fail=valid_issue_id_desc,
@@ -545,18 +1548,19 @@ class JIRAagentSkill(MycroftSkill):
         if not isinstance(issue_id, basestring):
             LOGGER.debug("issue_id is " + str(type(issue_id)))
         if issue_id is None:
-            LOGGER.exception("No valid issue_id from get_response. "
-                             "Better to bail out now.")
-        issue_id = re.sub(r'\s+', '', issue_id)
-        LOGGER.info("Attempted issue_id understanding:  '" + issue_id + "'")
+            LOGGER.debug("No valid issue_id from get_response. "
+                         "Better to bail out now.")
+            return None
+        issue_key = issue_key_from(issue_id)
+        LOGGER.info("Attempted issue_id understanding:  '" +
+                    str(issue_key) + "'")
         # TODO if this issue has/had a blocking issue: then examine that issue
         #   for recent resolution. If so, then mention it, and then
         #   offer to "tickle/remind/refresh" this issue
-        if isinstance(int(issue_id), int):
-            self.speak("Searching for issue " +
-                       self.project_key + '-' + str(issue_id))
+        if issue_key is not None:
+            self.speak("Searching for issue " + issue_key)
             try:
-                issue = self.jira.issue(self.project_key + '-' + str(issue_id))
+                issue = self.jira.issue(issue_key)
                 self.speak(self.clean_summary(issue.fields.summary))
                 if issue.fields.resolution is None:
                     self.speak(" is not yet resolved.")
@@ -580,6 +1584,13 @@ class JIRAagentSkill(MycroftSkill):
                     else:
                         cronproximate = self.descriptive_past(issue.fields.updated)
                         self.speak("Record last updated " + cronproximate)
+                    if self.timelines_ready():
+                        status_age = self.timelines.current_status_age(issue.key)
+                        if status_age is not None:
+                            self.speak("It has been in " + status_age[0] +
+                                       " status for " +
+                                       self.descriptive_duration(status_age[1]) +
+                                       ".")
                     self.speak("Issue is at " + issue.fields.priority.name +
                                " priority.")
                     if issue.fields.assignee is None:
@@ -634,45 +1645,66 @@ class JIRAagentSkill(MycroftSkill):
         """Collect enough information to create an issue record,
         then use the JIRA web API to create the issue record.
         """
-        self.speak("Unfortunately, I do not yet have the ability to file " +
-                   "an issue record by myself.")
-        # Should interim contact info lines just below just be
-        # a call to the function handle_contact_info_intent?
-        telephone_number = self.settings.get("support_telephone", "")
-        # TODO: pull from settings, but also have some kind of fallback.
-        # check and fallback on telephone number
-
-        email_address = ' '.join(list(self.settings.get("support_email", "")))
-        email_address = email_address.replace('.', 'dot')
-        # TODO: once the core pronounce_email method is available,
-        # replace this naive spell-out approach
-        data = {'telephone_number': telephone_number,
-                'email_address': email_address}
-        self.speak_dialog("human.contact.info", data)
-
-        self.enclosure.deactivate_mouth_events()
-        self.enclosure.mouth_text(telephone_number)
-        time.sleep((self.LETTERS_PER_SCREEN + len(telephone_number)) *
-                   self.SEC_PER_LETTER)
-        mycroft.audio.wait_while_speaking()
-        self.enclosure.activate_mouth_events()
-        self.enclosure.mouth_reset()
+        # No server connection required here: the outbox takes the issue
+        # immediately and files it once the server is reachable.
+        summary = self.get_response(dialog='describe.issue')
+        if summary is None or not summary.strip():
+            self.speak("Unfortunately, I did not catch a description of "
+                       "the issue, so I cannot file it.")
+            # fall back on the humans
+            self.handle_contact_info_intent(message)
+            return None
 
-        # TODO: real raise issue implementation steps:
+        fields = {'summary': self.clean_summary(summary),
+                  'description': "Raised by voice request via Mycroft:\n" +
+                                 summary.strip(),
+                  'issuetype': {'name': self.settings.get("issue_type",
+                                                          "Task") or "Task"}}
+        if self.project_key is not None:
+            fields['project'] = {'key': self.project_key}
+        reference = self.outbox.enqueue(fields)
+        self.speak_dialog("issue.queued", {'reference': reference})
+        self.start_outbox_flush(announce=True)
+
+        # TODO: remaining raise issue implementation steps:
         # Establish requestor identity
-        # Get brief general description
         # Get priority
         # Make a quick search through open
         # (and perhaps very recently closed) issues,
         #   is this a duplicate issue?
-        # Create Issue, display and read out ticket key/ID
-        #   (also print it out, if printer attached);
-        #   set_context() on issue id so if user immediately
-        #     afterward want to adjust or get warm fuzzy about it
-        #     they can just use pronouns and stuff.
+        # Once the outbox has the server key, also display it
+        #   (and print it out, if printer attached);
         #   also IM tech staff, if high priority {and IM capability})
 
 
+    def handle_issue_reference_intent(self, message):
+        """Tell the requestor which JIRA issue a provisional reference
+        number, spoken when the issue was raised, turned into.
+        """
+        try:
+            reference = int(message.data.get('ProvisionalReference'))
+        except (TypeError, ValueError):
+            self.speak("Sorry, I do not seem to have a valid reference "
+                       "number to look for.")
+            return None
+        state, key = self.outbox.lookup(reference)
+        if state == 'created':
+            self.speak_dialog("issue.filed", {'reference': reference,
+                                              'issue_key': key})
+            self.set_context('IssueID', key)
+        elif state == 'pending':
+            self.speak("Provisional reference " + str(reference) +
+                       " is still waiting to be filed with the server.")
+            self.start_outbox_flush(announce=True)
+        elif state == 'failed':
+            self.speak("Provisional reference " + str(reference) +
+                       " could not be filed, the server rejected it.")
+            self.handle_contact_info_intent(message)
+        else:
+            self.speak("I have no record of provisional reference " +
+                       str(reference) + ".")
+
+
     def handle_contact_info_intent(self, message):
         """Just reply with a summary of key contact information for
         traditional human-to-human voice or text communications.
@@ -692,6 +1724,12 @@ class JIRAagentSkill(MycroftSkill):
         self.enclosure.mouth_reset()
 
 
+    def shutdown(self):
+        if self.project_pool is not None:
+            self.project_pool.close()
+        super(JIRAagentSkill, self).shutdown()
+
+
     def stop(self):
         """The "stop" method defines what Mycroft does when told to stop during
         the skill's execution. In this case, since the skill's functionality